@@ -0,0 +1,24 @@
+"""Numba-compiled kernels for large latency matrices.
+
+Importing this module requires the optional ``numba`` extra
+(``pip install az-scout-plugin-latency-stats[numba]``); callers must
+handle ``ImportError`` and fall back to plain NumPy.
+"""
+
+import numpy as np
+import numpy.typing as npt
+from numba import njit, prange
+
+
+@njit(cache=True, parallel=True)  # type: ignore[misc, untyped-decorator, unused-ignore]
+def fill_matrix(
+    ids: npt.NDArray[np.intp],
+    matrix: npt.NDArray[np.int16],
+    out: npt.NDArray[np.int16],
+) -> None:
+    """Write ``matrix[ids[i], ids[j]]`` into ``out[i, j]``, splitting rows across threads."""
+    n = ids.shape[0]
+    for i in prange(n):
+        ii = ids[i]
+        for j in range(n):
+            out[i, j] = matrix[ii, ids[j]]
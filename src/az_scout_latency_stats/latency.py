@@ -13,70 +13,349 @@ Cache TTL: 24 hours (dataset is static, refreshed monthly by Microsoft).
 """
 
 import csv
-import time
+import io
+import re
+import sys
+from collections.abc import Callable, Mapping, Sequence
+from functools import cache, lru_cache
+from itertools import repeat
 from pathlib import Path
+from types import MappingProxyType
+from typing import NamedTuple, TypedDict, cast
+
+import numpy as np
+import numpy.typing as npt
+from cachetools import TTLCache
 
 from az_scout_latency_stats._log import logger
 
 # ---------------------------------------------------------------------------
 # Latency pairs loaded from CSV
 # Source: Azure Network Latency page, median RTT values (ms).
-# The CSV contains a full matrix; A→B and B→A may differ slightly.
+# The CSV contains a full matrix; A→B and B→A may differ slightly.  Each pair
+# is stored once, keeping the lower of the two published values.
 # Pairs not present in the CSV return None (unknown).
 # ---------------------------------------------------------------------------
 
-_LATENCY_PAIRS: dict[tuple[str, str], int] = {}
-_DATA_LOADED = False
 _CSV_PATH = Path(__file__).parent / "data" / "latency.csv"
 
+# Sentinel RTT for unknown pairs in the dense (NumPy) matrix.
+UNKNOWN_RTT = -1
+
+
+class LatencyMatrix(TypedDict):
+    """Result of :func:`get_latency_matrix`."""
+
+    regions: list[str]
+    matrix: npt.NDArray[np.int16]
+    unknown_value: int
+
+
+class LegacyLatencyMatrix(TypedDict):
+    """Result of :func:`get_latency_matrix_legacy`."""
+
+    regions: list[str]
+    matrix: list[list[int | None]]
+
+
+class _Dataset(NamedTuple):
+    """The parsed CSV dataset.
+
+    Pairs are stored as parallel arrays: ``names[src[k]]`` / ``names[dst[k]]``
+    have an RTT of ``rtt[k]`` ms, with ``src[k] < dst[k]`` and entries sorted
+    by region name.  ``regions`` maps a region name to its id.
+
+    ``matrix[regions[a], regions[b]]`` is the same data as a dense lookup
+    table (``UNKNOWN_RTT`` if the pair is missing).  The last row/column
+    (``unknown_id``) is all sentinels and is used for regions that are not
+    in the dataset.
+    """
+
+    names: tuple[str, ...]
+    regions: dict[str, int]
+    src: npt.NDArray[np.int32]
+    dst: npt.NDArray[np.int32]
+    rtt: npt.NDArray[np.int16]
+    unknown_id: int
+    matrix: npt.NDArray[np.int16]
+
 
 def _display_to_internal(name: str) -> str:
     """Convert a region display name (e.g. 'East US 2') to internal name ('eastus2')."""
     return name.strip().lower().replace(" ", "")
 
 
-def _load_csv() -> None:
-    """Load the latency CSV data into *_LATENCY_PAIRS* (once)."""
-    global _DATA_LOADED  # noqa: PLW0603
-    if _DATA_LOADED:
-        return
+@lru_cache(maxsize=1024)
+def _norm(name: str) -> str:
+    """Normalise a region name for lookups (``' EastUS '`` -> ``'eastus'``).
+
+    Results are interned so dict probes against the dataset's (also interned)
+    region names can short-circuit on identity.
+    """
+    return sys.intern(name.strip().lower())
+
+
+def _build_dataset(names: tuple[str, ...], rtt_matrix: npt.NDArray[np.int16]) -> _Dataset:
+    """Build the dataset from sorted *names* and their symmetric n x n RTT matrix."""
+    n = len(names)
+
+    # Row-major order over the upper triangle: entries come out sorted by (src, dst).
+    src, dst = np.nonzero(np.triu(rtt_matrix != UNKNOWN_RTT, k=1))
+    rtt = rtt_matrix[src, dst]
 
-    with _CSV_PATH.open(newline="", encoding="utf-8") as f:
-        reader = csv.reader(f)
-        header = next(reader)
-        # First column is "Source", remaining columns are destination regions.
-        dest_regions = [_display_to_internal(h) for h in header[1:]]
+    matrix = np.full((n + 1, n + 1), UNKNOWN_RTT, dtype=np.int16)
+    matrix[:n, :n] = rtt_matrix
+    np.fill_diagonal(matrix[:n, :n], 0)
 
-        for row in reader:
-            if not row or not row[0].strip():
+    dataset = _Dataset(
+        names=names,
+        regions={name: i for i, name in enumerate(names)},
+        src=src.astype(np.int32),
+        dst=dst.astype(np.int32),
+        rtt=rtt,
+        unknown_id=n,
+        matrix=matrix,
+    )
+    for arr in (dataset.src, dataset.dst, dataset.rtt, dataset.matrix):
+        arr.flags.writeable = False
+    return dataset
+
+
+_MISSING_RTT = np.iinfo(np.int16).max  # placeholder while folding directions together
+
+# An empty (or blank) cell right after a comma, i.e. a pair with no published value.
+_EMPTY_CELL = re.compile(r"(?<=,)[ \t]*(?=,|$)", re.MULTILINE)
+
+_Parsed = tuple[list[str], list[str], npt.NDArray[np.int16]]
+
+
+def _parse_fast(text: str) -> _Parsed:
+    """Parse the CSV *text* into ``(sources, dest_regions, directed)`` with NumPy's C reader.
+
+    ``directed[i, j]`` is the published RTT from ``sources[i]`` to
+    ``dest_regions[j]`` (``UNKNOWN_RTT`` if empty).  Raises ``ValueError`` on
+    anything it cannot parse: ragged rows, non-integer or out-of-range cells.
+    """
+    header, _, body = text.partition("\n")
+    dest_regions = [_display_to_internal(h) for h in next(csv.reader([header]))[1:]]
+    raw_sources = np.loadtxt(
+        io.StringIO(body), delimiter=",", quotechar='"', comments=None, dtype=object, usecols=0
+    )
+    sources = [_display_to_internal(s) for s in np.atleast_1d(raw_sources)]
+    if not all(sources):
+        raise ValueError("row without a source region")
+
+    directed = np.loadtxt(
+        io.StringIO(_EMPTY_CELL.sub(str(UNKNOWN_RTT), body)),
+        delimiter=",",
+        quotechar='"',
+        comments=None,
+        dtype=np.int16,
+        usecols=range(1, len(dest_regions) + 1),
+        ndmin=2,
+    )
+    if (directed < UNKNOWN_RTT).any():
+        raise ValueError("negative latency value")
+    return sources, dest_regions, directed
+
+
+def _parse_checked(text: str) -> _Parsed:
+    """Parse the CSV *text* cell by cell, logging and skipping anything malformed.
+
+    Same result as :func:`_parse_fast` for a well-formed file, but a bad cell
+    or row only loses that cell or row.
+    """
+    reader = csv.reader(io.StringIO(text))
+    # First column is "Source", remaining columns are destination regions.
+    dest_regions = [_display_to_internal(h) for h in next(reader)[1:]]
+    width = len(dest_regions)
+
+    sources: list[str] = []
+    rows: list[list[int]] = []
+    for row in reader:
+        if not row or not row[0].strip():
+            continue
+        source = _display_to_internal(row[0])
+        if len(row) != width + 1:
+            logger.warning("Row %r has %d values, expected %d", source, len(row) - 1, width)
+        values = [UNKNOWN_RTT] * width
+        for i, cell in enumerate(row[1 : width + 1]):
+            cell = cell.strip()
+            if not cell:
                 continue
-            source = _display_to_internal(row[0])
-            for i, cell in enumerate(row[1:]):
-                cell = cell.strip()
-                if not cell or i >= len(dest_regions):
-                    continue
-                dest = dest_regions[i]
-                if source == dest:
-                    continue  # self-latency handled separately
-                try:
-                    _LATENCY_PAIRS[(source, dest)] = int(cell)
-                except ValueError:
-                    logger.warning("Invalid latency value %r for %s -> %s", cell, source, dest)
-
-    _DATA_LOADED = True
-    logger.debug("Loaded %d latency pairs from %s", len(_LATENCY_PAIRS), _CSV_PATH)
+            if cell.isdecimal() and (rtt := int(cell)) < _MISSING_RTT:
+                values[i] = rtt
+            else:
+                logger.warning(
+                    "Invalid latency value %r for %s -> %s", cell, source, dest_regions[i]
+                )
+        sources.append(source)
+        rows.append(values)
+    return sources, dest_regions, np.array(rows, dtype=np.int16).reshape(len(rows), width)
+
+
+@cache
+def _load_csv() -> _Dataset:
+    """Load and parse the latency CSV (once; later calls return the cached result)."""
+    text = _CSV_PATH.read_text(encoding="utf-8")
+    try:
+        sources, dest_regions, directed = _parse_fast(text)
+    except ValueError as exc:
+        # loadtxt rejects the whole file; re-read it so only the bad cells are lost.
+        logger.warning("Malformed latency CSV %s (%s), parsing cell by cell", _CSV_PATH, exc)
+        sources, dest_regions, directed = _parse_checked(text)
+
+    names = tuple(sys.intern(name) for name in sorted({*sources, *dest_regions}))
+    # names is sorted, so a binary search maps region names to ids.
+    sorted_names = np.array(names)
+    rows = np.searchsorted(sorted_names, sources)
+    cols = np.searchsorted(sorted_names, dest_regions)
+
+    # Fold A->B and B->A together, keeping the lower of the two published values.
+    rtt_matrix = np.full((len(names), len(names)), _MISSING_RTT, dtype=np.int16)
+    rtt_matrix[np.ix_(rows, cols)] = np.where(directed == UNKNOWN_RTT, _MISSING_RTT, directed)
+    rtt_matrix = np.minimum(rtt_matrix, rtt_matrix.T)
+    rtt_matrix[rtt_matrix == _MISSING_RTT] = UNKNOWN_RTT
+    np.fill_diagonal(rtt_matrix, UNKNOWN_RTT)  # self-latency handled separately
+
+    dataset = _build_dataset(names, rtt_matrix)
+    logger.debug("Loaded %d latency pairs from %s", len(dataset.rtt), _CSV_PATH)
+    return dataset
+
+
+# ---------------------------------------------------------------------------
+# Optional Numba kernel for large matrices (``numba`` extra)
+# ---------------------------------------------------------------------------
+# Importing numba and the kernel's first call (loading the compiled cache and
+# starting its thread pool) cost close to a second; once warm, the kernel beats
+# np.ix_ at every size (~4 us vs ~19 us at 64 x 64).  Only requests this large
+# are worth paying that start-up for, so smaller ones never load numba.
+_NUMBA_MIN_CELLS = 4096
+
+_FillMatrix = Callable[[npt.NDArray[np.intp], npt.NDArray[np.int16], npt.NDArray[np.int16]], None]
+
+
+@cache
+def _load_fill_matrix() -> _FillMatrix | None:
+    """Return the Numba matrix kernel, or ``None`` if numba is not installed.
+
+    Imported on first use so that ``import az_scout_latency_stats.latency``
+    does not pay for importing numba.
+    """
+    try:
+        from az_scout_latency_stats._numba import fill_matrix
+    except ImportError:
+        return None
+    return cast(_FillMatrix, fill_matrix)
+
+
+def _take(matrix: npt.NDArray[np.int16], ids: npt.NDArray[np.intp]) -> npt.NDArray[np.int16]:
+    """Return ``matrix[np.ix_(ids, ids)]`` as a new array."""
+    n = ids.shape[0]
+    if n * n > _NUMBA_MIN_CELLS and (fill_matrix := _load_fill_matrix()) is not None:
+        out = np.empty((n, n), dtype=np.int16)
+        fill_matrix(ids, matrix, out)
+        return out
+    return matrix[np.ix_(ids, ids)]
 
 
 # ---------------------------------------------------------------------------
 # Cache for runtime-added pairs (e.g. from future API integration)
 # ---------------------------------------------------------------------------
 _CACHE_TTL = 86400  # 24 hours
-_cache: dict[str, tuple[float, int | None]] = {}
+# Keyed by the canonical ``(min, max)`` region-name tuple.
+_cache: TTLCache[tuple[str, str], int | None] = TTLCache(maxsize=1024, ttl=_CACHE_TTL)
+
+# Region sets larger than this are not kept in the matrix cache: the key comes
+# from client input and each entry is an n x n array (64 regions ~ 8 KiB).
+_MATRIX_CACHE_MAX_REGIONS = 64
+
+
+@lru_cache(maxsize=4096)
+def _static_rtt(a: str, b: str) -> int | None:
+    """Return the static-dataset RTT for two already-normalised region names.
+
+    Only covers the CSV data, which never changes once loaded; the runtime
+    cache has its own TTL and is checked by the caller.
+    """
+    if a == b:
+        return 0
+    data = _load_csv()
+    ia = data.regions.get(a, data.unknown_id)
+    ib = data.regions.get(b, data.unknown_id)
+    rtt = int(data.matrix[ia, ib])
+    return None if rtt == UNKNOWN_RTT else rtt
+
+
+def _rtt_raw(a: str, b: str) -> int | None:
+    """Return the RTT for two already-normalised region names (static, then runtime cache)."""
+    rtt = _static_rtt(a, b)
+    if rtt is not None:
+        return rtt
+
+    # Check runtime cache (expired entries are evicted by the TTLCache)
+    return _cache.get((a, b) if a < b else (b, a))
+
+
+def _static_matrix(names: Sequence[str]) -> npt.NDArray[np.int16]:
+    """Return the static RTT matrix for normalised *names*, in the given order."""
+    data = _load_csv()
+    # map() over the bound dict.get keeps the name -> id translation in C.
+    get_ids = map(data.regions.get, names, repeat(data.unknown_id))
+    ids = np.fromiter(get_ids, dtype=np.intp, count=len(names))
+    sub = _take(data.matrix, ids)
+    np.fill_diagonal(sub, 0)  # self-latency is 0, even for unknown regions
+
+    unknown = np.flatnonzero(ids == data.unknown_id)
+    unknown_names = [names[i] for i in unknown.tolist()]
+    if len(set(unknown_names)) < len(unknown_names):
+        # Unknown names share the sentinel row; repeats of the same name are self-pairs.
+        _, codes = np.unique(unknown_names, return_inverse=True)
+        same = codes[:, None] == codes[None, :]
+        sub[np.ix_(unknown, unknown)] = np.where(same, 0, UNKNOWN_RTT)
+    return sub
+
+
+@lru_cache(maxsize=256)
+def _matrix_cached(regions_key: tuple[str, ...]) -> npt.NDArray[np.int16]:
+    """Return the static RTT matrix for a sorted, de-duplicated tuple of normalised names.
+
+    The result is shared between callers and therefore read-only.
+    """
+    sub = _static_matrix(regions_key)
+    sub.flags.writeable = False
+    return sub
+
 
+def _latency_matrix(region_names: list[str]) -> tuple[list[str], npt.NDArray[np.int16]]:
+    """Return normalised region names and their int16 RTT matrix (``UNKNOWN_RTT`` if unknown).
 
-def _cache_key(a: str, b: str) -> str:
-    parts = sorted([a.lower(), b.lower()])
-    return f"{parts[0]}:{parts[1]}"
+    The matrix may be shared with other callers; treat it as read-only.
+    """
+    normalised = [_norm(r) for r in region_names]
+    regions_key = tuple(sorted(set(normalised)))
+    if len(regions_key) > _MATRIX_CACHE_MAX_REGIONS:
+        sub = _static_matrix(normalised)
+    else:
+        sub = _matrix_cached(regions_key)
+        if list(regions_key) != normalised:
+            # Map rows/columns of the cached matrix back to the requested order.
+            pos = {r: i for i, r in enumerate(regions_key)}
+            perm = np.fromiter(
+                map(pos.__getitem__, normalised), dtype=np.intp, count=len(normalised)
+            )
+            sub = _take(sub, perm)
+
+    if _cache:
+        # Pairs missing from the static dataset may still be in the runtime cache.
+        if not sub.flags.writeable:
+            sub = sub.copy()
+        for i, j in zip(*np.nonzero(sub == UNKNOWN_RTT), strict=True):
+            rtt = _rtt_raw(normalised[i], normalised[j])
+            if rtt is not None:
+                sub[i, j] = rtt
+
+    return normalised, sub
 
 
 # ---------------------------------------------------------------------------
@@ -92,61 +371,53 @@ def get_rtt_ms(region_a: str, region_b: str) -> int | None:
 
     Source: https://learn.microsoft.com/en-us/azure/networking/azure-network-latency
     """
-    _load_csv()
-
-    a = region_a.lower().strip()
-    b = region_b.lower().strip()
-
-    if a == b:
-        return 0
-
-    # Check static dataset
-    rtt = _LATENCY_PAIRS.get((a, b))
-    if rtt is not None:
-        return rtt
+    return _rtt_raw(_norm(region_a), _norm(region_b))
 
-    # Check runtime cache
-    ck = _cache_key(a, b)
-    cached = _cache.get(ck)
-    if cached is not None:
-        ts, val = cached
-        if time.monotonic() - ts < _CACHE_TTL:
-            return val
 
-    return None
+@cache
+def list_known_pairs() -> tuple[Mapping[str, str | int], ...]:
+    """Return all known latency pairs for inspection.
 
-
-def list_known_pairs() -> list[dict[str, str | int]]:
-    """Return all known latency pairs for inspection."""
-    _load_csv()
-
-    seen: set[tuple[str, str]] = set()
-    pairs: list[dict[str, str | int]] = []
-    for (a, b), rtt in _LATENCY_PAIRS.items():
-        key = (min(a, b), max(a, b))
-        if key not in seen:
-            seen.add(key)
-            pairs.append({"regionA": key[0], "regionB": key[1], "rttMs": rtt})
-    return sorted(pairs, key=lambda p: (p["regionA"], p["regionB"]))
+    The dataset is static, so the sorted result is computed once and shared
+    between callers; entries are read-only mappings so it cannot be altered.
+    """
+    data = _load_csv()
+    names = data.names
+    return tuple(
+        MappingProxyType({"regionA": names[a], "regionB": names[b], "rttMs": rtt})
+        for a, b, rtt in zip(data.src.tolist(), data.dst.tolist(), data.rtt.tolist(), strict=True)
+    )
 
 
 def get_latency_matrix(
     region_names: list[str],
-) -> dict[str, list[str] | list[list[int | None]]]:
+) -> LatencyMatrix:
     """Return a pairwise latency matrix for the given regions.
 
     Returns a dict with:
     - ``regions``: list of normalised region names
-    - ``matrix``: 2D list where ``matrix[i][j]`` is the RTT in ms
-      between ``regions[i]`` and ``regions[j]`` (``None`` if unknown).
+    - ``matrix``: int16 NumPy array where ``matrix[i, j]`` is the RTT in ms
+      between ``regions[i]`` and ``regions[j]``
+    - ``unknown_value``: the value used in ``matrix`` for unknown pairs
+      (``UNKNOWN_RTT``, i.e. ``-1``)
+
+    Results are cached per region set, so ``matrix`` may be shared between
+    calls — treat it as read-only.
+    """
+    regions, matrix = _latency_matrix(region_names)
+    return {"regions": regions, "matrix": matrix, "unknown_value": UNKNOWN_RTT}
+
+
+def get_latency_matrix_legacy(
+    region_names: list[str],
+) -> LegacyLatencyMatrix:
+    """Return a pairwise latency matrix for the given regions as nested lists.
+
+    Same as :func:`get_latency_matrix`, but ``matrix`` is a 2D list with
+    ``None`` for unknown pairs.
     """
-    _load_csv()
-
-    normalised = [r.lower().strip() for r in region_names]
-    matrix: list[list[int | None]] = []
-    for a in normalised:
-        row: list[int | None] = []
-        for b in normalised:
-            row.append(get_rtt_ms(a, b))
-        matrix.append(row)
-    return {"regions": normalised, "matrix": matrix}
+    regions, sub = _latency_matrix(region_names)
+    cells = sub.astype(object)
+    cells[sub == UNKNOWN_RTT] = None
+    matrix: list[list[int | None]] = cells.tolist()
+    return {"regions": regions, "matrix": matrix}
@@ -2,7 +2,8 @@
 
 from typing import Literal
 
-from fastapi import APIRouter
+import orjson
+from fastapi import APIRouter, Response
 from pydantic import BaseModel, Field
 
 from az_scout_latency_stats.metadata import (
@@ -46,7 +47,14 @@ class LatencyMatrixResponse(BaseModel):
 
     regions: list[str] = Field(description="Normalised region names")
     matrix: list[list[int | None]] = Field(
-        description="2D matrix — matrix[i][j] is RTT ms between regions[i] and regions[j]"
+        description=(
+            "2D matrix — matrix[i][j] is RTT ms between regions[i] and regions[j]. "
+            "Unknown pairs are null in cloud63 mode and -1 in azuredocs mode."
+        )
+    )
+    unknown_value: int | None = Field(
+        default=None,
+        description="azuredocs mode only — the value of matrix cells for unknown pairs (-1)",
     )
     mode: Literal["azuredocs", "cloud63"]
     source: str
@@ -102,7 +110,7 @@ class InterZoneMatrixResponse(BaseModel):
 
 
 @router.post("/inter-region/matrix", response_model=LatencyMatrixResponse)
-async def latency_matrix(body: LatencyMatrixRequest) -> dict[str, object]:
+async def latency_matrix(body: LatencyMatrixRequest) -> dict[str, object] | Response:
     """Return a pairwise RTT latency matrix for the given regions.
 
     Available at ``/plugins/latency-stats/inter-region/matrix``.
@@ -125,13 +133,21 @@ async def latency_matrix(body: LatencyMatrixRequest) -> dict[str, object]:
 
     from az_scout_latency_stats.latency import get_latency_matrix
 
-    result = get_latency_matrix(body.regions)
-    return {
-        **result,
+    # Serialise the int16 matrix directly rather than cell-by-cell via pydantic;
+    # the raw Response bypasses response_model, which only documents the schema here.
+    latency = get_latency_matrix(body.regions)
+    content = {
+        "regions": latency["regions"],
+        "matrix": latency["matrix"],
+        "unknown_value": latency["unknown_value"],
         "mode": "azuredocs",
         "source": AZUREDOCS_SOURCE,
         "disclaimer": AZUREDOCS_DISCLAIMER,
     }
+    return Response(
+        orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY),
+        media_type="application/json",
+    )
 
 
 @router.get("/inter-region/pairs", response_model=LatencyPairsResponse)
@@ -331,6 +331,10 @@
 
                 const mode = getMode();
                 const data = await apiPost(`/plugins/${PLUGIN_NAME}/inter-region/matrix`, { regions: selected, mode });
+                if (data.unknown_value != null) {
+                    // azuredocs mode marks unknown pairs with a sentinel; renderers expect null
+                    data.matrix = data.matrix.map(row => row.map(rtt => (rtt === data.unknown_value ? null : rtt)));
+                }
                 renderLatencyMap(data, mapEl, legendEl);
                 renderLatencyTable(data, tableEl);
             } catch (e) {
@@ -1,6 +1,8 @@
 """MCP tools for the latency stats plugin."""
 
-import json
+from collections.abc import Mapping
+
+import orjson
 
 from az_scout_latency_stats.metadata import (
     AZUREDOCS_DISCLAIMER,
@@ -13,6 +15,11 @@ from az_scout_latency_stats.metadata import (
 )
 
 
+def _dumps(result: Mapping[str, object]) -> str:
+    """Serialise a tool result as compact JSON (consumed by MCP clients, not humans)."""
+    return orjson.dumps(result).decode()
+
+
 def inter_region_latency(source_region: str, target_region: str, mode: str = "azuredocs") -> str:
     """Return indicative RTT latency between two Azure regions.
 
@@ -29,7 +36,7 @@ def inter_region_latency(source_region: str, target_region: str, mode: str = "az
         )
 
         if not is_cloud63_loaded():
-            return json.dumps(
+            return _dumps(
                 {
                     "error": (
                         "Cloud63 data not yet loaded. "
@@ -37,7 +44,6 @@ def inter_region_latency(source_region: str, target_region: str, mode: str = "az
                         "or call the /matrix endpoint with mode='cloud63'."
                     ),
                 },
-                indent=2,
             )
 
         rtt = get_cloud63_rtt_ms(source_region, target_region)
@@ -49,7 +55,7 @@ def inter_region_latency(source_region: str, target_region: str, mode: str = "az
             "source": CLOUD63_SOURCE,
             "disclaimer": CLOUD63_DISCLAIMER,
         }
-        return json.dumps(result, indent=2)
+        return _dumps(result)
 
     from az_scout_latency_stats.latency import get_rtt_ms
 
@@ -62,7 +68,7 @@ def inter_region_latency(source_region: str, target_region: str, mode: str = "az
         "source": AZUREDOCS_SOURCE,
         "disclaimer": AZUREDOCS_DISCLAIMER,
     }
-    return json.dumps(result, indent=2)
+    return _dumps(result)
 
 
 def inter_zone_latency(region: str, source_zone: str = "", target_zone: str = "") -> str:
@@ -85,7 +91,7 @@ def inter_zone_latency(region: str, source_zone: str = "", target_zone: str = ""
     )
 
     if not is_inter_zone_loaded():
-        return json.dumps(
+        return _dumps(
             {
                 "error": (
                     "Inter-zone data not yet loaded. "
@@ -93,12 +99,11 @@ def inter_zone_latency(region: str, source_zone: str = "", target_zone: str = ""
                     "or call the /inter-zone/matrix endpoint."
                 ),
             },
-            indent=2,
         )
 
     if source_zone and target_zone:
         latency_us = get_inter_zone_latency_us(region, source_zone, target_zone)
-        return json.dumps(
+        return _dumps(
             {
                 "region": region,
                 "sourcePhysicalZone": f"{region}-{source_zone}",
@@ -109,16 +114,14 @@ def inter_zone_latency(region: str, source_zone: str = "", target_zone: str = ""
                 "methodology": INTER_ZONE_METHODOLOGY,
                 "disclaimer": INTER_ZONE_DISCLAIMER,
             },
-            indent=2,
         )
 
     matrix = get_inter_zone_matrix(region)
-    return json.dumps(
+    return _dumps(
         {
             **matrix,
             "source": INTER_ZONE_SOURCE,
             "methodology": INTER_ZONE_METHODOLOGY,
             "disclaimer": INTER_ZONE_DISCLAIMER,
         },
-        indent=2,
     )
@@ -1,7 +1,15 @@
 """Tests for the latency stats plugin."""
 
+import logging
+from pathlib import Path
+
+import pytest
+
+from az_scout_latency_stats._log import logger
 from az_scout_latency_stats.latency import (
+    UNKNOWN_RTT,
     get_latency_matrix,
+    get_latency_matrix_legacy,
     get_rtt_ms,
     list_known_pairs,
 )
@@ -27,6 +35,9 @@ class TestGetRttMs:
         assert isinstance(rtt_ab, int)
         assert isinstance(rtt_ba, int)
 
+    def test_symmetric(self) -> None:
+        assert get_rtt_ms("eastus", "westeurope") == get_rtt_ms("westeurope", "eastus")
+
     def test_unknown_pair_returns_none(self) -> None:
         assert get_rtt_ms("francecentral", "nonexistentregion") is None
 
@@ -52,6 +63,21 @@ class TestListKnownPairs:
         keys = {(p["regionA"], p["regionB"]) for p in pairs}
         assert len(keys) == len(pairs)
 
+    def test_sorted_and_cached(self) -> None:
+        pairs = list_known_pairs()
+        keys = [(p["regionA"], p["regionB"]) for p in pairs]
+        assert keys == sorted(keys)
+        assert list_known_pairs() is pairs
+
+    def test_entries_are_read_only(self) -> None:
+        pair = list_known_pairs()[0]
+        with pytest.raises(TypeError):
+            pair["rttMs"] = 0  # type: ignore[index]
+
+    def test_canonical_order(self) -> None:
+        for p in list_known_pairs():
+            assert str(p["regionA"]) < str(p["regionB"])
+
 
 class TestGetLatencyMatrix:
     """Unit tests for get_latency_matrix."""
@@ -60,20 +86,19 @@ class TestGetLatencyMatrix:
         result = get_latency_matrix(["francecentral", "westeurope"])
         assert result["regions"] == ["francecentral", "westeurope"]
         matrix = result["matrix"]
-        assert len(matrix) == 2
-        assert len(matrix[0]) == 2
+        assert matrix.shape == (2, 2)
+        assert matrix.dtype.name == "int16"
         # Diagonal = 0
-        assert matrix[0][0] == 0
-        assert matrix[1][1] == 0
+        assert matrix[0, 0] == 0
+        assert matrix[1, 1] == 0
         # Off-diagonal = known RTT
-        assert matrix[0][1] is not None
-        assert matrix[1][0] is not None
+        assert matrix[0, 1] > 0
+        assert matrix[1, 0] > 0
 
     def test_unknown_pair_in_matrix(self) -> None:
         result = get_latency_matrix(["francecentral", "nonexistentregion"])
-        matrix = result["matrix"]
-        assert matrix[0][1] is None
-        assert matrix[1][0] is None
+        assert result["unknown_value"] == UNKNOWN_RTT
+        assert result["matrix"].tolist() == [[0, UNKNOWN_RTT], [UNKNOWN_RTT, 0]]
 
     def test_normalises_case(self) -> None:
         result = get_latency_matrix(["FranceCentral", "WestEurope"])
@@ -81,10 +106,188 @@ class TestGetLatencyMatrix:
 
     def test_single_region(self) -> None:
         result = get_latency_matrix(["eastus"])
-        assert len(result["matrix"]) == 1
-        assert result["matrix"][0][0] == 0
+        assert result["matrix"].tolist() == [[0]]
 
     def test_empty_regions(self) -> None:
         result = get_latency_matrix([])
         assert result["regions"] == []
-        assert result["matrix"] == []
+        assert result["matrix"].shape == (0, 0)
+
+    def test_region_set_is_cached_across_orders(self) -> None:
+        import az_scout_latency_stats.latency as mod
+
+        forward = get_latency_matrix(["francecentral", "eastus", "westeurope"])["matrix"]
+        hits = mod._matrix_cached.cache_info().hits
+        reverse = get_latency_matrix(["WestEurope", "eastus", "francecentral", "eastus"])
+        assert mod._matrix_cached.cache_info().hits == hits + 1
+        assert reverse["regions"] == ["westeurope", "eastus", "francecentral", "eastus"]
+        perm = [2, 1, 0, 1]
+        assert reverse["matrix"].tolist() == [[forward[i, j] for j in perm] for i in perm]
+
+    def test_large_region_set_is_not_cached(self) -> None:
+        import az_scout_latency_stats.latency as mod
+
+        unknown = [f"unknownregion{i}" for i in range(mod._MATRIX_CACHE_MAX_REGIONS)]
+        regions = ["francecentral", "westeurope", *unknown, "UnknownRegion0"]
+        size = mod._matrix_cached.cache_info().currsize
+        matrix = get_latency_matrix(regions)["matrix"]
+        assert mod._matrix_cached.cache_info().currsize == size
+
+        expected = [
+            [UNKNOWN_RTT if (rtt := get_rtt_ms(a, b)) is None else rtt for b in regions]
+            for a in regions
+        ]
+        assert matrix.tolist() == expected
+
+    def test_numba_is_imported_lazily(self) -> None:
+        import subprocess
+        import sys
+
+        code = (
+            "import sys\n"
+            "from az_scout_latency_stats.latency import get_latency_matrix, get_rtt_ms\n"
+            "get_rtt_ms('francecentral', 'westeurope')\n"
+            "get_latency_matrix(['francecentral', 'westeurope'])\n"
+            "assert 'numba' not in sys.modules\n"
+        )
+        subprocess.run([sys.executable, "-c", code], check=True)
+
+    def test_large_matrix_numba_kernel(self) -> None:
+        pytest.importorskip("numba")
+        from unittest.mock import Mock, patch
+
+        import az_scout_latency_stats.latency as mod
+
+        data = mod._load_csv()
+        # Every known region plus enough unknown ones to cross the kernel threshold.
+        regions = [*reversed(data.names), *(f"unknownregion{i}" for i in range(20))]
+        assert len(set(regions)) ** 2 > mod._NUMBA_MIN_CELLS
+
+        kernel = Mock(wraps=mod._load_fill_matrix())
+        with patch.object(mod, "_load_fill_matrix", return_value=kernel):
+            matrix = get_latency_matrix(regions)["matrix"]
+        assert any(call.args[1] is data.matrix for call in kernel.call_args_list)
+
+        expected = [
+            [UNKNOWN_RTT if (rtt := get_rtt_ms(a, b)) is None else rtt for b in regions]
+            for a in regions
+        ]
+        assert matrix.tolist() == expected
+
+
+class TestGetLatencyMatrixLegacy:
+    """Unit tests for get_latency_matrix_legacy."""
+
+    def test_unknown_pair_is_none(self) -> None:
+        result = get_latency_matrix_legacy(["francecentral", "nonexistentregion"])
+        assert result["regions"] == ["francecentral", "nonexistentregion"]
+        assert result["matrix"] == [[0, None], [None, 0]]
+
+    def test_matches_get_rtt_ms(self) -> None:
+        regions = ["francecentral", "eastus", "westeurope", "nonexistentregion", "eastus"]
+        result = get_latency_matrix_legacy(regions)
+        for i, a in enumerate(regions):
+            for j, b in enumerate(regions):
+                assert result["matrix"][i][j] == get_rtt_ms(a, b)
+
+
+class TestLoadCsv:
+    """Unit tests for the CSV loader."""
+
+    def test_well_formed_csv(self, tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+        from unittest.mock import patch
+
+        import az_scout_latency_stats.latency as mod
+
+        csv_path = tmp_path / "latency.csv"
+        csv_path.write_text(
+            'Source,"Region A",Region B,Region C\n'
+            'Region A,,"85",\n'
+            "Region B,86,, 7\n"
+            "\n"
+            "Region C,40,9,\n",
+            encoding="utf-8",
+        )
+        with (
+            patch.object(mod, "_CSV_PATH", csv_path),
+            patch.object(mod, "_parse_checked", wraps=mod._parse_checked) as checked,
+            caplog.at_level(logging.WARNING, logger=logger.name),
+        ):
+            data = mod._load_csv.__wrapped__()
+
+        checked.assert_not_called()
+        assert not caplog.records
+        assert data.names == ("regiona", "regionb", "regionc")
+        assert data.matrix[:3, :3].tolist() == [[0, 85, 40], [85, 0, 7], [40, 7, 0]]
+
+    def test_malformed_csv(self, tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+        from unittest.mock import patch
+
+        import az_scout_latency_stats.latency as mod
+
+        csv_path = tmp_path / "latency.csv"
+        csv_path.write_text(
+            "Source,Region A,Region B,Region C,Region D\n"
+            'Region A,,"85",12.5,x\n'
+            "Region B,86,,-3\n"
+            "Region C,40,7,,1,99\n"
+            "Region D,1e3, 5 ,,\n",
+            encoding="utf-8",
+        )
+        with (
+            patch.object(mod, "_CSV_PATH", csv_path),
+            caplog.at_level(logging.WARNING, logger=logger.name),
+        ):
+            data = mod._load_csv.__wrapped__()
+
+        pairs = {
+            (data.names[a], data.names[b]): int(rtt)
+            for a, b, rtt in zip(data.src, data.dst, data.rtt, strict=True)
+        }
+        assert pairs == {
+            ("regiona", "regionb"): 85,
+            ("regiona", "regionc"): 40,
+            ("regionb", "regionc"): 7,
+            ("regionb", "regiond"): 5,
+            ("regionc", "regiond"): 1,
+        }
+        messages = [r.getMessage() for r in caplog.records]
+        assert any(m.startswith("Malformed latency CSV") for m in messages)
+        assert "Invalid latency value '1e3' for regiond -> regiona" in messages
+        assert "Invalid latency value '12.5' for regiona -> regionc" in messages
+        assert "Invalid latency value 'x' for regiona -> regiond" in messages
+        assert "Invalid latency value '-3' for regionb -> regionc" in messages
+        assert "Row 'regionb' has 3 values, expected 4" in messages
+        assert "Row 'regionc' has 5 values, expected 4" in messages
+
+
+class TestRuntimeCache:
+    """Unit tests for runtime-added pairs."""
+
+    def test_cached_pair_is_returned(self) -> None:
+        import az_scout_latency_stats.latency as mod
+
+        mod._cache[("francecentral", "nonexistentregion")] = 42
+        try:
+            assert get_rtt_ms("NonExistentRegion", "francecentral") == 42
+            result = get_latency_matrix_legacy(["francecentral", "nonexistentregion"])
+            assert result["matrix"] == [[0, 42], [42, 0]]
+        finally:
+            mod._cache.clear()
+
+    def test_expired_pair_is_ignored(self) -> None:
+        from unittest.mock import patch
+
+        from cachetools import TTLCache
+
+        import az_scout_latency_stats.latency as mod
+
+        now = [0.0]
+        cache: TTLCache[tuple[str, str], int | None] = TTLCache(
+            maxsize=8, ttl=mod._CACHE_TTL, timer=lambda: now[0]
+        )
+        with patch.object(mod, "_cache", cache):
+            cache[("francecentral", "nonexistentregion")] = 42
+            assert get_rtt_ms("francecentral", "nonexistentregion") == 42
+            now[0] += mod._CACHE_TTL
+            assert get_rtt_ms("francecentral", "nonexistentregion") is None
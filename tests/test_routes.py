@@ -36,6 +36,20 @@ class TestLatencyMatrixAzuredocsMode:
         data = resp.json()
         assert data["mode"] == "azuredocs"
 
+    def test_unknown_pair_uses_sentinel(self) -> None:
+        resp = client.post(
+            "/inter-region/matrix",
+            json={"regions": ["FranceCentral", "westeurope", "nonexistentregion"]},
+        )
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["regions"] == ["francecentral", "westeurope", "nonexistentregion"]
+        assert data["matrix"][0][0] == 0
+        assert data["matrix"][0][1] > 0
+        assert data["unknown_value"] == -1
+        assert data["matrix"][2] == [-1, -1, 0]
+        assert "mask" not in data
+
 
 class TestLatencyMatrixCloud63Mode:
     """Test /matrix endpoint in cloud63 mode (with mocked fetch)."""
@@ -25,6 +25,11 @@ class TestRegionLatencyAzuredocsMode:
         result = json.loads(inter_region_latency("francecentral", "nonexistent", mode="azuredocs"))
         assert result["rttMs"] is None
 
+    def test_output_is_compact(self) -> None:
+        raw = inter_region_latency("francecentral", "westeurope")
+        assert "\n" not in raw
+        assert raw == json.dumps(json.loads(raw), separators=(",", ":"), ensure_ascii=False)
+
 
 class TestRegionLatencyCloud63Mode:
     """Test inter_region_latency tool in cloud63 mode."""